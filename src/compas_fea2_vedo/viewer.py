@@ -1,14 +1,100 @@
-from vedo import Plotter, Points, Mesh, TetMesh, Cone, Glyph, Arrows, Grid, Text2D, precision, Sphere, Axes, Polygon
-from compas_fea2.model import Model, Part
+import weakref
+from typing import Any
+from typing import List
+from typing import Optional
+from typing import Tuple
+
+import numpy as np
+from compas_fea2.model import Model
+from compas_fea2.model import Part
 from compas_fea2.problem import Step
+from vedo import Arrows
+from vedo import Axes
+from vedo import Cone
+from vedo import Glyph
+from vedo import Grid
+from vedo import Mesh
+from vedo import Plotter
+from vedo import Points
+from vedo import Polygon
+from vedo import Sphere
+from vedo import TetMesh
+from vedo import Text2D
+from vedo import precision
+from vtkmodules.util.numpy_support import get_vtk_to_numpy_typemap
+from vtkmodules.util.numpy_support import numpy_to_vtk
+from vtkmodules.util.numpy_support import numpy_to_vtkIdTypeArray
+from vtkmodules.util.numpy_support import vtk_to_numpy
+from vtkmodules.vtkCommonCore import VTK_ID_TYPE
+from vtkmodules.vtkCommonCore import vtkPoints
+from vtkmodules.vtkCommonDataModel import VTK_TETRA
+from vtkmodules.vtkCommonDataModel import vtkCellArray
+from vtkmodules.vtkCommonDataModel import vtkUnstructuredGrid
 
 # from compas_fea2.results.fields import FieldResults  # Assuming this is your field results type
-import numpy as np
-from typing import List, Tuple, Optional, Any
 
 # Type alias for field results
 # FieldResultsType = TypeAlias("compas_fea2.results.fields._FieldResults")
 
+_UP = np.array([[0.0, 0.0, 1.0]], dtype=np.float32)
+_ID_DTYPE = get_vtk_to_numpy_typemap()[VTK_ID_TYPE]  # numpy dtype of vtkIdType, 32 or 64 bit depending on the VTK build
+
+
+def _as_xyz_array(items: Any, count: int, dtype: Any = np.float32) -> np.ndarray:
+    """Pack ``count`` 3D points or vectors into a (count, 3) array in a single pass."""
+    return np.fromiter((c for item in items for c in item), dtype=dtype, count=3 * count).reshape(-1, 3)
+
+
+def _sort_nodes(nodes: List[Any]) -> Tuple[List[Any], np.ndarray]:
+    """Sort nodes by part key and return them with their (N, 3) float32 coordinates."""
+    keys = np.fromiter((n.part_key for n in nodes), dtype=np.int64, count=len(nodes))
+    xyz = _as_xyz_array((n.xyz for n in nodes), len(nodes))
+    if np.all(keys[1:] >= keys[:-1]):
+        # nodes are usually stored in key order already: skip the reordering
+        return nodes, xyz
+    order = np.argsort(keys, kind="stable")
+    return [nodes[i] for i in order], xyz[order]
+
+
+def _tet_cells(connectivity: np.ndarray) -> vtkCellArray:
+    """Build the VTK cell array of an (E, 4) tetrahedra connectivity, to be shared between meshes."""
+    cells = vtkCellArray()
+    cells.SetData(4, numpy_to_vtkIdTypeArray(np.ascontiguousarray(connectivity, dtype=_ID_DTYPE).ravel(), deep=True))
+    return cells
+
+
+def _tetmesh(points: np.ndarray, cells: vtkCellArray) -> TetMesh:
+    """Create a TetMesh from new points and a prebuilt VTK cell array."""
+    vtk_points = vtkPoints()
+    vtk_points.SetData(numpy_to_vtk(np.ascontiguousarray(points), deep=True))
+    grid = vtkUnstructuredGrid()
+    grid.SetPoints(vtk_points)
+    grid.SetCells(VTK_TETRA, cells)
+    return TetMesh(grid)
+
+
+def _merge_tets(vertices: List[np.ndarray], connectivities: List[np.ndarray]) -> Tuple[np.ndarray, np.ndarray, List[slice]]:
+    """Stack the vertices and tetrahedra of several meshes into a single one.
+
+    The connectivity of each mesh is shifted by the number of vertices of the meshes before it.
+    Also returns the slice of the merged vertices taken by each mesh.
+    """
+    slices = []
+    offset = 0
+    for points in vertices:
+        slices.append(slice(offset, offset + len(points)))
+        offset += len(points)
+    connectivity = np.concatenate([conn + part_slice.start for conn, part_slice in zip(connectivities, slices)])
+    return np.concatenate(vertices), connectivity, slices
+
+
+def _merge_point_data(arrays: List[np.ndarray], slices: List[slice]) -> np.ndarray:
+    """Gather per-mesh point data into the layout of a mesh merged with `_merge_tets`."""
+    merged = np.empty(slices[-1].stop, dtype=np.float32)
+    for array, part_slice in zip(arrays, slices):
+        merged[part_slice] = array
+    return merged
+
 
 class FEA2Viewer:
     def __init__(self, shape: Tuple = (1, 1), *args: Any, **kwargs: Any) -> None:
@@ -21,6 +107,7 @@ class FEA2Viewer:
         self.cmap = "jet"
         self.grid = None  # Store the grid actor
         self.camera_position = None
+        self._scalar_arrays = weakref.WeakKeyDictionary()  # mesh -> (cmap, on, title, vtk scalar array)
 
         if kwargs.get("show_grid", False):
             self.add_grid()
@@ -51,8 +138,21 @@ class FEA2Viewer:
         on: str = "points",
     ) -> Mesh:
         if values is not None:
-            mesh.cmap(cmap, values, on=on)
-            mesh.add_scalarbar(title=title, font_size=24)
+            values = np.asarray(values)
+            cached = self._scalar_arrays.get(mesh)
+            if cached and cached[:3] == (cmap, on, title) and cached[3].GetNumberOfTuples() == len(values):
+                # same colormap and scalar bar on the same mesh: refresh the VTK array in place instead of rebuilding it
+                vtkarr = cached[3]
+                vtk_to_numpy(vtkarr)[:] = values
+                vtkarr.Modified()
+                vmin, vmax = float(values.min()), float(values.max())
+                mesh.mapper.SetScalarRange(vmin, vmax)
+                mesh.mapper.GetLookupTable().SetRange(vmin, vmax)
+            else:
+                mesh.cmap(cmap, values, on=on)
+                data = mesh.dataset.GetPointData() if on == "points" else mesh.dataset.GetCellData()
+                self._scalar_arrays[mesh] = (cmap, on, title, data.GetScalars())
+                mesh.add_scalarbar(title=title, font_size=24)
         return mesh
 
     def add_isolines_to_mesh(self, mesh: Mesh, n: int = 10) -> Mesh:
@@ -61,12 +161,11 @@ class FEA2Viewer:
         isolines.c("black").lw(4)
         return isolines
 
-    def add_isosurfaces_to_mesh(self, mesh: Mesh, n: int, scalars: list) -> Mesh:
-        iso_values = np.linspace(min(scalars), max(scalars), n)
-        isosurfaces = []
-        for value in iso_values:
-            isosurfaces.append(mesh.isosurface(value=value))
-        return isosurfaces
+    def add_isosurfaces_to_mesh(self, mesh: Mesh, n: int, scalars: np.ndarray) -> Mesh:
+        scalars = np.asarray(scalars)
+        iso_values = np.linspace(scalars.min(), scalars.max(), n)
+        # a single contour filter with all the values traverses the mesh only once
+        return mesh.isosurface(value=iso_values.tolist())
 
     def show(self, camera_position: Optional[Tuple] = None) -> None:
         if camera_position:
@@ -75,16 +174,37 @@ class FEA2Viewer:
 
 
 class ModelViewer(FEA2Viewer):
+    _BC_CONE_HEIGHT = 50
+    _BC_CONE = None  # shared glyph template, built on first use
+
     def __init__(self, model: Model, *args: Any, **kwargs: Any) -> None:
         super().__init__(*args, **kwargs)
         self.model = model
         self._parts = [PartViewer(part) for part in self.model.parts]
+        self._part_slices = []
+        self._elements = self._merge_parts()
 
     @property
     def parts(self) -> List["PartViewer"]:
         """Get parts from the model."""
         return self._parts
 
+    @property
+    def elements(self) -> Optional[TetMesh]:
+        """Get the merged mesh of all the parts, or None if the model has a single part."""
+        return self._elements
+
+    def _merge_parts(self) -> Optional[TetMesh]:
+        """Merge the elements of all the parts into a single mesh, so that they are drawn with one actor.
+
+        A single part is drawn with its own mesh. The vertices of each part are
+        stored in ``self._part_slices`` for recoloring.
+        """
+        if len(self.parts) < 2:
+            return None
+        vertices, connectivity, self._part_slices = _merge_tets([part.vertices for part in self.parts], [part.elements_connectivity for part in self.parts])
+        return _tetmesh(vertices, _tet_cells(connectivity)).alpha(self.mesh_alpha).c(self.mesh_color)
+
     def add_part(self, part: Part) -> None:
         """Add parts to the plotter.
 
@@ -98,16 +218,19 @@ class ModelViewer(FEA2Viewer):
 
     def add_bcs(self) -> None:
         """Add boundary conditions to the plotter."""
-        cone_height = 50
-        cone = Cone(r=cone_height / 2, height=cone_height).scale(1).rotate_y(90)
-        for bc, nodes in self.model.bcs.items():
-            pts = np.c_[[n.xyz for n in nodes]]
-            vecs = np.tile([0, 0, 1], (len(nodes), 1))
-            offsets = vecs * (cone_height / 2)
-            shifted_pts = pts - offsets
-            glyph = Glyph(shifted_pts, cone, vecs, c="red", alpha=0.8)
-            glyph.lighting("ambient")
-            self.plotter.add(glyph)
+        cone_height = self._BC_CONE_HEIGHT
+        nodes = [n for bc_nodes in self.model.bcs.values() for n in bc_nodes]
+        if not nodes:
+            return
+        if ModelViewer._BC_CONE is None:
+            ModelViewer._BC_CONE = Cone(r=cone_height / 2, height=cone_height).scale(1).rotate_y(90)
+        # all the supports share the same glyph and color: draw them in one go
+        pts = _as_xyz_array((n.xyz for n in nodes), len(nodes))
+        vecs = np.broadcast_to(_UP, (len(nodes), 3))
+        shifted_pts = pts - _UP * (cone_height / 2)
+        glyph = Glyph(shifted_pts, ModelViewer._BC_CONE, vecs, c="red", alpha=0.8)
+        glyph.lighting("ambient")
+        self.plotter.add(glyph)
 
     def add_node_field_results(self, field, draw_vectors: float = None, draw_cmap: str = None, draw_isolines: int = None, draw_isosurfaces: int = None) -> None:
         """Add field results to the plotter.
@@ -125,8 +248,21 @@ class ModelViewer(FEA2Viewer):
         draw_isosurfaces : int
             The number of isosurfaces to draw.
         """
+        if self.elements is None:
+            for part in self.parts:
+                part.add_node_field_results(field, draw_vectors, draw_cmap, draw_isolines, draw_isosurfaces)
+            return
+
+        if (draw_isolines or draw_isosurfaces) and not draw_cmap:
+            draw_cmap = "viridis"
+        # the merged mesh carries the color map: the hidden part meshes are colored only for their isolines and isosurfaces
+        part_cmap = draw_cmap if (draw_isolines or draw_isosurfaces) else None
         for part in self.parts:
-            part.add_node_field_results(field, draw_vectors, draw_cmap, draw_isolines, draw_isosurfaces)
+            part.add_node_field_results(field, draw_vectors, part_cmap, draw_isolines, draw_isosurfaces)
+
+        if draw_cmap:
+            scalars = _merge_point_data([part.scalars for part in self.parts], self._part_slices)
+            self.add_cmap_to_mesh(self.elements, values=scalars, title=field.field_name, cmap=draw_cmap)
 
     def add_stess_field_results(self, field, draw_vectors: bool, draw_cmap: bool, draw_isolines: int) -> None:
         """Add stress field results to the plotter.
@@ -214,8 +350,11 @@ class ModelViewer(FEA2Viewer):
             self.plotter.add(part._isosurfaces)
             # self.plotter.add(self.cut_mesh(part.elements, None))
         if show_parts:
+            if self.elements is not None:
+                self.plotter.add(self.elements)
             for part in self.parts:
-                self.plotter.add(part.elements)
+                if self.elements is None:
+                    self.plotter.add(part.elements)
                 self.plotter.add(part.isolines)
                 self.plotter.add(part.deformed)
                 self.plotter.add(part.field_vectors)
@@ -236,29 +375,42 @@ class PartViewer(FEA2Viewer):
         """
         super().__init__(*args, **kwargs)
         self.part = part
-        self._vertices = part.points_sorted
+        self._nodes_sorted, self._vertices = _sort_nodes(list(part.nodes))
         self._points = Points(self.vertices, r=self.point_size, c=self.point_color).legend("Nodes")
-        self._elements_connectivity = part.elements_connectivity
-        self._elements = TetMesh([self.vertices, self.elements_connectivity]).alpha(self.mesh_alpha).c(self.mesh_color)
+        try:
+            connectivity = np.asarray(part.elements_connectivity, dtype=np.int32)
+        except ValueError:
+            raise ValueError(f"Only 4-node tetrahedral elements can be visualized, part {part.name} mixes elements with different numbers of nodes.")
+        if connectivity.ndim != 2 or connectivity.shape[1] != 4:
+            raise ValueError(f"Only 4-node tetrahedral elements can be visualized, got a connectivity of shape {connectivity.shape} for part {part.name}.")
+        self._elements_connectivity = connectivity
+        self._vtk_cells = _tet_cells(self._elements_connectivity)
+        self._elements = _tetmesh(self.vertices, self._vtk_cells).alpha(self.mesh_alpha).c(self.mesh_color)
         self._isolines = None
         self._isosurfaces = None
         self._field_vectors = None
         self._deformed = None
+        self._scalars = None
         self._shapes = []
 
     @property
-    def vertices(self) -> List[List[float]]:
-        """Get vertices from nodes."""
+    def vertices(self) -> np.ndarray:
+        """Get vertices from nodes, as an (N, 3) float32 array sorted by node key."""
         return self._vertices
 
+    @property
+    def nodes_sorted(self) -> list:
+        """Get the nodes of the part sorted by key, cached at construction."""
+        return self._nodes_sorted
+
     @property
     def points(self) -> Points:
         """Create points for nodes and store them in actors."""
         return self._points
 
     @property
-    def elements_connectivity(self) -> List[List[int]]:
-        """Get connectivity from elements."""
+    def elements_connectivity(self) -> np.ndarray:
+        """Get connectivity from elements, as an (E, 4) int32 array of node keys."""
         return self._elements_connectivity
 
     @property
@@ -276,6 +428,11 @@ class PartViewer(FEA2Viewer):
         """Get deformed shape from mesh."""
         return self._deformed
 
+    @property
+    def scalars(self) -> Optional[np.ndarray]:
+        """Get the nodal scalars of the last field added."""
+        return self._scalars
+
     @property
     def field_vectors(self) -> Optional[Arrows]:
         """Get field vectors from mesh."""
@@ -329,20 +486,17 @@ class PartViewer(FEA2Viewer):
         draw_isosurfaces : int
             The number of isosurfaces to draw. If None, isosurfaces are not drawn
         """
-        locations = []
-        vectors = []
-        scalars = []
-        for loc in sorted(self.part.nodes, key=lambda n: n.part_key):
-            vec = field.get_result_at(loc).vector.scaled(draw_vectors)
-            loc = loc.xyz
-            locations.append(loc)
-            vectors.append(loc + vec)
-            scalars.append(vec.length)
+        nodes = self.nodes_sorted
+        vecs = _as_xyz_array((field.get_result_at(n).vector for n in nodes), len(nodes))
+        if draw_vectors:
+            vecs *= draw_vectors
+        scalars = np.sqrt(np.einsum("ij,ij->i", vecs, vecs))
 
         if draw_vectors:
+            ends = self.vertices + vecs
             arrows = Arrows(
-                start_pts=locations,
-                end_pts=vectors,
+                start_pts=self.vertices,
+                end_pts=ends,
                 c="blue",
                 alpha=0.1,
                 res=4,
@@ -353,6 +507,7 @@ class PartViewer(FEA2Viewer):
         if (draw_isolines or draw_isosurfaces) and not draw_cmap:
             draw_cmap = "viridis"
 
+        self._scalars = scalars
         if draw_cmap:
             mesh = self.add_cmap_to_mesh(self.elements, values=scalars, title=field.field_name, cmap=draw_cmap)
 
@@ -371,11 +526,14 @@ class PartViewer(FEA2Viewer):
         sf : float
             The scale factor for the deformed shape.
         """
-        new_pts = []
-        for node in sorted(self.part.nodes, key=lambda n: n.part_key):
-            vec = node.displacement(step).vector.scaled(sf)
-            new_pts.append(node.xyz + vec)
-        self._deformed = TetMesh([new_pts, self.elements_connectivity])
+        nodes = self.nodes_sorted
+        disp = _as_xyz_array((n.displacement(step).vector for n in nodes), len(nodes))
+        new_pts = self.vertices + sf * disp
+        if self._deformed is None:
+            self._deformed = _tetmesh(new_pts, self._vtk_cells)
+        else:
+            # the connectivity does not change: only upload the new points
+            self._deformed.vertices = new_pts
 
     def add_mode_shapes(self, shapes, sf):
         """Add mode shapes to the plotter.
@@ -387,20 +545,35 @@ class PartViewer(FEA2Viewer):
         sf : float
             The scale factor for the mode shapes.
         """
-        for shape in shapes:
-            locations = []
-            vectors = []
-            scalars = []
-
-            displacements = list(zip(shape.locations, shape.vectors))
-            displacements = sorted(displacements, key=lambda x: x[0].key)
-
-            for disp in displacements:
-                vec = disp[1].scaled(sf)
-                loc = disp[0].xyz
-                locations.append(loc + vec)
-                vectors.append(loc + vec)
-                scalars.append(vec.length)
-            mesh = TetMesh([locations, self.elements_connectivity])
-            self._shapes.append(mesh)
+        shapes = list(shapes)
+        # drop the meshes of modes left over from a previous, longer call
+        for mesh in self._shapes[len(shapes) :]:
+            self._scalar_arrays.pop(mesh, None)
+        del self._shapes[len(shapes) :]
+        if not shapes:
+            return
+
+        # preallocated (M, N, 3) arrays of all the modes, filled by index and then displaced and measured at once;
+        # each mode's points and scalars are contiguous slices, so they reach VTK without further copies
+        pts_all = vecs_all = None
+        for i, shape in enumerate(shapes):
+            locations = list(shape.locations)
+            count = len(locations)
+            if pts_all is None:
+                pts_all = np.empty((len(shapes), count, 3), dtype=np.float32)
+                vecs_all = np.empty((len(shapes), count, 3), dtype=np.float32)
+            order = np.argsort(np.fromiter((n.key for n in locations), dtype=np.int64, count=count), kind="stable")
+            pts_all[i] = _as_xyz_array((n.xyz for n in locations), count)[order]
+            vecs_all[i] = _as_xyz_array(shape.vectors, count)[order]
+        vecs_all *= sf
+        scal_all = np.sqrt(np.einsum("mnj,mnj->mn", vecs_all, vecs_all))
+        pts_all += vecs_all
+
+        for i, (shape, pts, scalars) in enumerate(zip(shapes, pts_all, scal_all)):
+            if i < len(self._shapes):
+                mesh = self._shapes[i]
+                mesh.vertices = pts
+            else:
+                mesh = _tetmesh(pts, self._vtk_cells)
+                self._shapes.append(mesh)
             self.add_cmap_to_mesh(mesh=mesh, values=scalars, title=shape.field_name, cmap=self.cmap)
@@ -0,0 +1,16 @@
+import sys
+import types
+
+try:
+    import compas_fea2  # noqa: F401
+except ImportError:
+    # the viewer only uses compas_fea2 for type annotations: stub it so that the tests run without the package
+    compas_fea2 = types.ModuleType("compas_fea2")
+    model = types.ModuleType("compas_fea2.model")
+    model.Model = type("Model", (), {})
+    model.Part = type("Part", (), {})
+    problem = types.ModuleType("compas_fea2.problem")
+    problem.Step = type("Step", (), {})
+    compas_fea2.model = model
+    compas_fea2.problem = problem
+    sys.modules.update({"compas_fea2": compas_fea2, "compas_fea2.model": model, "compas_fea2.problem": problem})
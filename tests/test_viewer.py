@@ -0,0 +1,108 @@
+from types import SimpleNamespace
+
+import pytest
+
+np = pytest.importorskip("numpy")
+pytest.importorskip("vedo")
+
+from compas_fea2_vedo.viewer import ModelViewer  # noqa: E402
+from compas_fea2_vedo.viewer import _merge_point_data  # noqa: E402
+from compas_fea2_vedo.viewer import _merge_tets  # noqa: E402
+from compas_fea2_vedo.viewer import _sort_nodes  # noqa: E402
+from compas_fea2_vedo.viewer import _tet_cells  # noqa: E402
+from compas_fea2_vedo.viewer import _tetmesh  # noqa: E402
+
+
+def _node(key, xyz):
+    return SimpleNamespace(part_key=key, xyz=xyz)
+
+
+def test_sort_nodes_sorted():
+    nodes = [_node(i, [i, 0, 0]) for i in range(3)]
+    nodes_sorted, vertices = _sort_nodes(nodes)
+    assert nodes_sorted is nodes
+    assert vertices.dtype == np.float32
+    assert vertices.tolist() == [[0, 0, 0], [1, 0, 0], [2, 0, 0]]
+
+
+def test_sort_nodes_unsorted():
+    nodes = [_node(2, [2, 0, 0]), _node(0, [0, 0, 0]), _node(1, [1, 0, 0])]
+    nodes_sorted, vertices = _sort_nodes(nodes)
+    assert [n.part_key for n in nodes_sorted] == [0, 1, 2]
+    assert vertices.tolist() == [[0, 0, 0], [1, 0, 0], [2, 0, 0]]
+
+
+def test_merge_tets():
+    vertices_a = np.zeros((4, 3), dtype=np.float32)
+    vertices_b = np.ones((5, 3), dtype=np.float32)
+    conn_a = np.array([[0, 1, 2, 3]], dtype=np.int32)
+    conn_b = np.array([[0, 1, 2, 3], [1, 2, 3, 4]], dtype=np.int32)
+    vertices, connectivity, slices = _merge_tets([vertices_a, vertices_b], [conn_a, conn_b])
+    assert vertices.shape == (9, 3)
+    assert connectivity.tolist() == [[0, 1, 2, 3], [4, 5, 6, 7], [5, 6, 7, 8]]
+    assert slices == [slice(0, 4), slice(4, 9)]
+    assert (vertices[slices[1]] == 1).all()
+
+
+def test_merge_point_data():
+    slices = [slice(0, 2), slice(2, 5)]
+    scalars = _merge_point_data([np.array([1.0, 2.0]), np.array([3.0, 4.0, 5.0])], slices)
+    assert scalars.dtype == np.float32
+    assert scalars.tolist() == [1.0, 2.0, 3.0, 4.0, 5.0]
+
+
+def test_tet_cells():
+    connectivity = np.array([[0, 1, 2, 3], [1, 2, 3, 4]], dtype=np.int32)
+    cells = _tet_cells(connectivity)
+    assert cells.GetNumberOfCells() == 2
+    assert cells.IsHomogeneous() == 4
+
+
+def test_tetmesh():
+    points = np.array([[0, 0, 0], [1, 0, 0], [0, 1, 0], [0, 0, 1], [1, 1, 1]], dtype=np.float32)
+    cells = _tet_cells(np.array([[0, 1, 2, 3], [1, 2, 3, 4]], dtype=np.int32))
+    first = _tetmesh(points, cells)
+    second = _tetmesh(points + 1, cells)
+    assert first.dataset.GetNumberOfPoints() == 5
+    assert first.dataset.GetNumberOfCells() == 2
+    assert second.dataset.GetNumberOfCells() == 2
+    assert first.dataset.GetPoint(4) == (1.0, 1.0, 1.0)
+    assert second.dataset.GetPoint(4) == (2.0, 2.0, 2.0)
+
+
+class _FakePartViewer:
+    """Stands for a PartViewer, recording the color map it is asked to draw."""
+
+    def __init__(self, scalars):
+        self.vertices = np.zeros((len(scalars), 3), dtype=np.float32)
+        self.scalars = np.asarray(scalars, dtype=np.float32)
+        self.cmaps = []
+
+    def add_node_field_results(self, field, draw_vectors, draw_cmap, draw_isolines, draw_isosurfaces):
+        self.cmaps.append(draw_cmap)
+
+
+def _merged_viewer(parts):
+    viewer = ModelViewer.__new__(ModelViewer)
+    viewer._parts = parts
+    viewer._elements = "merged"
+    _, _, viewer._part_slices = _merge_tets([part.vertices for part in parts], [np.empty((0, 4), dtype=np.int32) for part in parts])
+    viewer.cmaps = []
+    viewer.add_cmap_to_mesh = lambda mesh, values, title, cmap: viewer.cmaps.append((mesh, values.tolist(), title, cmap))
+    return viewer
+
+
+def test_merged_node_field_results_cmap():
+    parts = [_FakePartViewer([1.0, 2.0]), _FakePartViewer([3.0, 4.0, 5.0])]
+    viewer = _merged_viewer(parts)
+    viewer.add_node_field_results(SimpleNamespace(field_name="U"), draw_cmap="jet")
+    assert [part.cmaps for part in parts] == [[None], [None]]
+    assert viewer.cmaps == [("merged", [1.0, 2.0, 3.0, 4.0, 5.0], "U", "jet")]
+
+
+def test_merged_node_field_results_isolines():
+    parts = [_FakePartViewer([1.0]), _FakePartViewer([2.0, 3.0])]
+    viewer = _merged_viewer(parts)
+    viewer.add_node_field_results(SimpleNamespace(field_name="U"), draw_isolines=5)
+    assert [part.cmaps for part in parts] == [["viridis"], ["viridis"]]
+    assert viewer.cmaps == [("merged", [1.0, 2.0, 3.0], "U", "viridis")]